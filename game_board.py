@@ -1,8 +1,84 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+import random
 
 Coordinate = Tuple[int, int]
+# Packed move used by the search: source square | destination square << 6 | captured-squares bitboard << 12.
+MoveCode = int
+MOVE_KEY_MASK = 0xFFF  # source and destination bits of a MoveCode, enough to recognise a move in a position
+
+# Bitboard layout: square (r,c) is bit r*8+c; bit 0 is the top-left corner.
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
+INITIAL_BLACK_MEN = 0x0000000000AA55AA  # dark squares of rows 0..2
+INITIAL_WHITE_MEN = 0x55AA550000000000  # dark squares of rows 5..7
+
+FILE_A = 0x0101010101010101      # column 0
+FILE_H = 0x8080808080808080      # column 7
+NOT_FILE_A = FULL_BOARD ^ FILE_A  # pieces that can step towards column 0
+NOT_FILE_H = FULL_BOARD ^ FILE_H  # pieces that can step towards column 7
+NOT_FILES_AB = FULL_BOARD ^ (FILE_A | FILE_A << 1)  # pieces that can jump towards column 0
+NOT_FILES_GH = FULL_BOARD ^ (FILE_H | FILE_H >> 1)  # pieces that can jump towards column 7
+TOP_ROW = 0x00000000000000FF     # white men promote here
+BOTTOM_ROW = 0xFF00000000000000  # black men promote here
+PROMOTE_MASK = (TOP_ROW, 0, BOTTOM_ROW, 0)  # by kind index: where that kind is crowned (kings never are)
+
+# Diagonal steps per piece kind: men move forward only, kings both ways.
+_DIRS = {'w': ((-1, -1), (-1, 1)),
+         'W': ((-1, -1), (-1, 1), (1, -1), (1, 1)),
+         'b': ((1, -1), (1, 1)),
+         'B': ((1, -1), (1, 1), (-1, -1), (-1, 1))}
+
+# Which bitboard attribute holds each piece kind, and its kind index (0..3) into ZOBRIST.
+_PIECE_ATTR = {'w': 'wm', 'W': 'wk', 'b': 'bm', 'B': 'bk'}
+_PIECE_KIND = {'w': 0, 'W': 1, 'b': 2, 'B': 3}
+
+# Zobrist keys: ZOBRIST[kind][square], plus ZOBRIST_STM toggled on every move.
+# Seeded so every process (and every run) hashes positions identically.
+_zrng = random.Random(0x5EED)
+ZOBRIST = tuple(tuple(_zrng.getrandbits(64) for _ in range(64)) for _ in range(4))
+ZOBRIST_STM = _zrng.getrandbits(64)
+
+def _ZobristOf(words: Tuple[int, int, int, int]) -> int: # Zobrist hash of (wm, wk, bm, bk) from scratch (white to move)
+    z = 0
+    for kind, bb in enumerate(words):
+        while bb:
+            lsb = bb & -bb
+            bb ^= lsb
+            z ^= ZOBRIST[kind][lsb.bit_length() - 1]
+    return z
+
+INITIAL_HASH = _ZobristOf((INITIAL_WHITE_MEN, 0, INITIAL_BLACK_MEN, 0))
+
+# Static evaluation, kept up to date as GameBoard.score (positive is good for black): a man is worth 3 plus a point
+# per row advanced (BV/WV by bit index), a king KING_VALUE. SQUARE_VALUE[kind][square] is the signed value of a
+# piece of that kind standing there.
+BV = tuple(3 + (i >> 3) for i in range(64))
+WV = tuple(3 + 7 - (i >> 3) for i in range(64))
+KING_VALUE = 5
+SQUARE_VALUE = (tuple(-v for v in WV), (-KING_VALUE,) * 64, BV, (KING_VALUE,) * 64)
+
+def _ScoreOf(words: Tuple[int, int, int, int]) -> int: # evaluation of (wm, wk, bm, bk) from scratch
+    score = 0
+    for kind, bb in enumerate(words):
+        while bb:
+            lsb = bb & -bb
+            bb ^= lsb
+            score += SQUARE_VALUE[kind][lsb.bit_length() - 1]
+    return score
+
+INITIAL_SCORE = _ScoreOf((INITIAL_WHITE_MEN, 0, INITIAL_BLACK_MEN, 0))
+
+# Make's undo record: the bitboards, hash and score from before the move.
+Undo = Tuple[int, int, int, int, int, int]
+
+def SquareBit(rc: Coordinate) -> int: # single-bit mask for (r,c)
+    r, c = rc
+    return 1 << (r * 8 + c)
+
+_COORDS = tuple((i >> 3, i & 7) for i in range(64))  # bit index -> (r,c)
+DARK = tuple((r, c) for r, c in _COORDS if (r + c) % 2 == 1)  # the 32 playable squares
+
 @dataclass
 class Move:
     # Single checker move from a StartingMoveLocation to a TargetingMoveLocation.
@@ -14,168 +90,285 @@ class Move:
 
 class GameBoard:
     """
-    8x8 Checkers board with the following piece encoding: 'w' = white man (human), 'W' = white king; 'b' = black man (bot),   'B' = black king; '.' = empty
+    8x8 Checkers board stored as four 64-bit bitboards: wm = white men (human), wk = white kings; bm = black men (bot), bk = black kings.
+    PieceAt/SetPiece still speak the character encoding: 'w', 'W', 'b', 'B' and '.' = empty.
     White moves 'up' (towards decreasing rows); Black moves 'down' (towards increasing rows). Capture is mandatory when available.
     """
     def __init__(self) -> None:
         self.size = 8
-        self.board = self._InitialBoard()
-
-    def _InitialBoard(self) -> List[List[str]]:
-        b = [['.' for _ in range(self.size)] for _ in range(self.size)]
-
-        for r in range(3):
-            for c in range(self.size):
-                if (r + c) % 2 == 1: # dark square
-                    b[r][c] = 'b'
-        for r in range(5, 8):
-            for c in range(self.size):
-                if (r + c) % 2 == 1:
-                    b[r][c] = 'w'
-        return b
-
-    def Clone(self) -> 'GameBoard': 
-        g = GameBoard()
-        g.board = [row[:] for row in self.board]
+        # The starting position and its hash are module constants, so a new board is a handful of assignments.
+        self.wm, self.wk = INITIAL_WHITE_MEN, 0
+        self.bm, self.bk = INITIAL_BLACK_MEN, 0
+        self.zhash = INITIAL_HASH  # Zobrist hash, kept up to date by Make/Unmake/SetPiece
+        self.score = INITIAL_SCORE  # HeuristicScore of the position, kept up to date the same way
+        # LegalMoveCodes results per side, valid while zhash still equals _legal_cache_hash.
+        self._legal_cache: Dict[str, List[MoveCode]] = {}
+        self._legal_cache_hash = None
+
+    def _ComputeHash(self) -> int: # Zobrist hash from scratch (white to move)
+        return _ZobristOf((self.wm, self.wk, self.bm, self.bk))
+
+    def Clone(self) -> 'GameBoard':
+        g = GameBoard.__new__(GameBoard)  # skip __init__: every field is copied below
+        g.size = self.size
+        g.wm, g.wk, g.bm, g.bk = self.wm, self.wk, self.bm, self.bk
+        g.zhash = self.zhash
+        g.score = self.score
+        g._legal_cache = {}
+        g._legal_cache_hash = None
         return g
 
     def Inside(self, r: int, c: int) -> bool: # is (r,c) on the board?
         return 0 <= r < self.size and 0 <= c < self.size
 
     def PieceAt(self, rc: Coordinate) -> str: # return piece at (r,c)
-        r, c = rc
-        return self.board[r][c]
+        bit = SquareBit(rc)
+        if self.wm & bit:
+            return 'w'
+        if self.wk & bit:
+            return 'W'
+        if self.bm & bit:
+            return 'b'
+        if self.bk & bit:
+            return 'B'
+        return '.'
 
     def SetPiece(self, rc: Coordinate, piece: str) -> None: # place/replace piece at (r,c)
-        r, c = rc
-        self.board[r][c] = piece
+        bit = SquareBit(rc)
+        idx = bit.bit_length() - 1
+        old = self.PieceAt(rc)
+        if old != '.':
+            self.zhash ^= ZOBRIST[_PIECE_KIND[old]][idx]
+            self.score -= SQUARE_VALUE[_PIECE_KIND[old]][idx]
+        if piece != '.':
+            self.zhash ^= ZOBRIST[_PIECE_KIND[piece]][idx]
+            self.score += SQUARE_VALUE[_PIECE_KIND[piece]][idx]
+        keep = ~bit & FULL_BOARD
+        self.wm &= keep
+        self.wk &= keep
+        self.bm &= keep
+        self.bk &= keep
+        if piece != '.':
+            attr = _PIECE_ATTR[piece]
+            setattr(self, attr, getattr(self, attr) | bit)
+
+    def _SideBits(self, side: str) -> int: # all squares occupied by side
+        return (self.wm | self.wk) if side == 'w' else (self.bm | self.bk)
+
+    def _Occupied(self) -> int:
+        return self.wm | self.wk | self.bm | self.bk
 
-    def IsTerminal(self) -> bool: # game over? either side has no pieces or no legal moves
-        return (not self._HasPieces('w') or not self._HasPieces('b') or
-                (len(self.AllLegalMoves('w')) == 0) or (len(self.AllLegalMoves('b')) == 0))
+    def IsTerminal(self, side_to_move: Optional[str] = None) -> bool:
+        """Game over? Either side has no pieces, or the side to move has no legal moves.
+        Without side_to_move, a position where either side is stuck counts as over.
+        """
+        if not self._HasPieces('w') or not self._HasPieces('b'):
+            return True
+        if side_to_move is not None:
+            return len(self.LegalMoveCodes(side_to_move)) == 0
+        return (len(self.LegalMoveCodes('w')) == 0) or (len(self.LegalMoveCodes('b')) == 0)
 
     def _HasPieces(self, side: str) -> bool: # does side ('w' or 'b') have any pieces left?
-        targets = ('w', 'W') if side == 'w' else ('b', 'B')
-        return any(cell in targets for row in self.board for cell in row)
+        return self._SideBits(side) != 0
 
     def _Directions(self, piece: str): # movement directions for piece
-        if piece in ('w', 'W'):
-            ups = [(-1, -1), (-1, 1)]
-            if piece == 'W':  # king
-                return ups + [(1, -1), (1, 1)]
-            return ups
-        else:
-            downs = [(1, -1), (1, 1)]
-            if piece == 'B':  # king
-                return downs + [(-1, -1), (1, 1)]
-            return downs
+        return _DIRS[piece]
 
-    def _Opponents(self, side: str): 
+    def _Opponents(self, side: str):
         return ('b', 'B') if side == 'w' else ('w', 'W')
 
     def AllLegalMoves(self, side: str) -> List[Move]:
         """Return all legal moves for side ('w' or 'b') honoring mandatory capture."""
+        return [DecodeMove(code) for code in self.LegalMoveCodes(side)]
+
+    def AllLegalCaptures(self, side: str) -> List[Move]:
+        """The side's legal moves if it has a capture (they are then all forced captures), otherwise []."""
+        return [DecodeMove(code) for code in self.LegalCaptureCodes(side)]
+
+    def LegalCaptureCodes(self, side: str) -> List[MoveCode]:
+        """AllLegalCaptures as packed move codes (the cached LegalMoveCodes list when non-empty)."""
+        return self.LegalMoveCodes(side) if self._HasAnyCapture(side) else []
+
+    def LegalMoveCodes(self, side: str) -> List[MoveCode]:
+        """AllLegalMoves as packed move codes; this is what the search iterates over.
+        The list is cached until the board changes, so callers must not modify it.
+        """
+        if self._legal_cache_hash != self.zhash:
+            # Every mutation changes zhash, so a stale cache is detected here rather than cleared in Make/Unmake.
+            self._legal_cache = {}
+            self._legal_cache_hash = self.zhash
+        codes = self._legal_cache.get(side)
+        if codes is None:
+            codes = self._CaptureCodes(side) if self._HasAnyCapture(side) else self._QuietCodes(side)
+            self._legal_cache[side] = codes
+        return codes
+
+    def _HasAnyCapture(self, side: str) -> bool:
+        """Can side jump anything? Tests every first jump side-wide with shifts, without expanding multi-jumps."""
+        empty = ~self._Occupied() & FULL_BOARD
+        if side == 'w':
+            up, down, opponents = self.wm | self.wk, self.wk, self.bm | self.bk
+        else:
+            up, down, opponents = self.bk, self.bm | self.bk, self.wm | self.wk
+        if ((((up & NOT_FILES_AB) >> 9) & opponents) >> 9) & empty:
+            return True
+        if ((((up & NOT_FILES_GH) >> 7) & opponents) >> 7) & empty:
+            return True
+        if ((((down & NOT_FILES_AB) << 7) & opponents) << 7) & empty:
+            return True
+        return bool(((((down & NOT_FILES_GH) << 9) & opponents) << 9) & empty)
+
+    def _CaptureCodes(self, side: str) -> List[MoveCode]:
         captures = []
-        quiets = []
-        for r in range(self.size):
-            for c in range(self.size):
-                piece = self.board[r][c]
-                if piece == '.':
-                    continue
-                if side == 'w' and piece not in ('w', 'W'):
-                    continue
-                if side == 'b' and piece not in ('b', 'B'):
-                    continue
-                caps, qs = self._MovesFrom((r, c), piece, side)
-                captures.extend(caps)
-                quiets.extend(qs)
-        return captures if captures else quiets
-
-    def _MovesFrom(self, rc: Coordinate, piece: str, side: str):
-        """Return (captures, quiets) from a given square, including multi-jumps for captures."""
-        captures = []
-        quiets = []
         seen = set()
+        empty = ~self._Occupied() & FULL_BOARD
+        if side == 'w':
+            kings, opponents, men_jump = self.wk, self.bm | self.bk, WM_JUMP
+        else:
+            kings, opponents, men_jump = self.bk, self.wm | self.wk, BM_JUMP
 
-        def try_quiet(fr: int, fc: int, dr: int, dc: int):
-            nr, nc = fr + dr, fc + dc
-            if self.Inside(nr, nc) and self.board[nr][nc] == '.':
-                mv = Move(StartingMoveLocation=(fr, fc),
-                          TargetingMoveLocation=(nr, nc),
-                          path=[(fr, fc), (nr, nc)],
-                          is_capture=False,
-                          captured=[])
-                quiets.append(mv)
-
-        def try_captures(fr: int, fc: int, piece_local: str, path, captured): # recursive multi-jump
+        def try_captures(src: int, sq: int, jumps, open_squares: int, captured_bits: int): # recursive multi-jump
+            # While jumping, the origin and every captured square count as empty and captured pieces can't be jumped again.
             found = False
-            for dr, dc in self._Directions(piece_local):
-                mr, mc = fr + dr, fc + dc
-                lr, lc = fr + 2*dr, fc + 2*dc
-                if (self.Inside(lr, lc) and self.board[lr][lc] == '.' and
-                        self.Inside(mr, mc) and self.board[mr][mc] in self._Opponents(side)):
-                    cap_pos = (mr, mc)
-                    if cap_pos in captured:
-                        continue
-                    orig = self.board[fr][fc]
-                    self.board[fr][fc] = '.'
-                    cap_orig = self.board[mr][mc]
-                    self.board[mr][mc] = '.'
-                    landed_piece = piece_local
-                    if side == 'w' and lr == 0 and piece_local == 'w':
-                        landed_piece = 'W'
-                    if side == 'b' and lr == self.size - 1 and piece_local == 'b':
-                        landed_piece = 'B'
-                    dest_orig = self.board[lr][lc]
-                    self.board[lr][lc] = landed_piece
-                    try:
-                        found = True
-                        try_captures(lr, lc, landed_piece, path + [(lr, lc)], captured + [cap_pos])
-                    finally:
-                        self.board[fr][fc] = orig
-                        self.board[mr][mc] = cap_orig
-                        self.board[lr][lc] = dest_orig
-            if not found and len(captured) > 0:
-                mv = Move(StartingMoveLocation=path[0],
-                          TargetingMoveLocation=path[-1],
-                          path=path[:],
-                          is_capture=True,
-                          captured=captured[:])
-                key = (mv.StartingMoveLocation, tuple(mv.path), tuple(mv.captured))
-                if key not in seen:
-                    captures.append(mv)
-                    seen.add(key)
-
-        r, c = rc
-        # Generate quiets
-        for dr, dc in self._Directions(piece):
-            try_quiet(r, c, dr, dc)
-
-        # Generate captures
-        try_captures(r, c, piece, [(r, c)], [])
-
-        return captures, quiets
-
-    def ApplyMove(self, move: Move) -> None:
-        sr, sc = move.StartingMoveLocation
-        tr, tc = move.TargetingMoveLocation
-        piece = self.board[sr][sc]
-        self.board[sr][sc] = '.'
-        for cr, cc in move.captured:
-            self.board[cr][cc] = '.'
-        if piece == 'w' and tr == 0:
-            piece = 'W'
-        elif piece == 'b' and tr == self.size - 1:
-            piece = 'B'
-        self.board[tr][tc] = piece
+            for mid, land, lsq in jumps[sq]:
+                if (open_squares | captured_bits) & land and opponents & ~captured_bits & mid:
+                    found = True
+                    # A man reaching its far row has no forward jump left, so the move ends there and Make crowns it.
+                    try_captures(src, lsq, jumps, open_squares, captured_bits | mid)
+            if not found and captured_bits:
+                code = src | (sq << 6) | (captured_bits << 12)
+                # A man only jumps forward, so its path follows from the captures; only kings can reach the
+                # same outcome twice (round a loop either way) and need the dedup set.
+                if jumps is not K_JUMP:
+                    captures.append(code)
+                elif code not in seen:
+                    captures.append(code)
+                    seen.add(code)
+
+        pieces = self._SideBits(side)
+        while pieces:
+            lsb = pieces & -pieces
+            pieces ^= lsb
+            sq = lsb.bit_length() - 1
+            try_captures(sq, sq, K_JUMP if kings & lsb else men_jump, empty | lsb, 0)
+        return captures
+
+    def _QuietCodes(self, side: str) -> List[MoveCode]:
+        """Every non-capturing step for side, one shift per diagonal across the whole side at once."""
+        empty = ~self._Occupied() & FULL_BOARD
+        if side == 'w':
+            up, down = self.wm | self.wk, self.wk
+        else:
+            up, down = self.bk, self.bm | self.bk
+        quiets = []
+        for delta, movers in ((-9, up & NOT_FILE_A), (-7, up & NOT_FILE_H),
+                              (7, down & NOT_FILE_A), (9, down & NOT_FILE_H)):
+            targets = (movers << delta if delta > 0 else movers >> -delta) & empty
+            while targets:
+                lsb = targets & -targets
+                targets ^= lsb
+                dsq = lsb.bit_length() - 1
+                quiets.append((dsq - delta) | (dsq << 6))
+        return quiets
+
+    def _KindOf(self, bit: int) -> int: # kind index (0..3) of the piece on an occupied square
+        if self.wm & bit:
+            return 0
+        if self.wk & bit:
+            return 1
+        if self.bm & bit:
+            return 2
+        return 3
+
+    def Make(self, code: MoveCode) -> Undo:
+        """Play a packed move in place and return the undo record for Unmake."""
+        undo = (self.wm, self.wk, self.bm, self.bk, self.zhash, self.score)
+        s = code & 63
+        d = (code >> 6) & 63
+        captured = code >> 12
+        src, dst = 1 << s, 1 << d
+        keep = ~(src | captured) & FULL_BOARD
+        z = self.zhash ^ ZOBRIST_STM
+        score = self.score
+        while captured:
+            lsb = captured & -captured
+            captured ^= lsb
+            victim, sq = self._KindOf(lsb), lsb.bit_length() - 1
+            z ^= ZOBRIST[victim][sq]
+            score -= SQUARE_VALUE[victim][sq]
+        kind = self._KindOf(src)
+        new_kind = kind | ((dst & PROMOTE_MASK[kind]) != 0)  # a man landing on its far row becomes kind + 1
+        words = [self.wm & keep, self.wk & keep, self.bm & keep, self.bk & keep]
+        words[new_kind] |= dst
+        self.wm, self.wk, self.bm, self.bk = words
+        self.zhash = z ^ ZOBRIST[kind][s] ^ ZOBRIST[new_kind][d]
+        self.score = score - SQUARE_VALUE[kind][s] + SQUARE_VALUE[new_kind][d]
+        return undo
+
+    def MakeNull(self) -> Undo:
+        """Pass the turn (the search's null move): only the side-to-move part of the hash changes. Undo with Unmake."""
+        undo = (self.wm, self.wk, self.bm, self.bk, self.zhash, self.score)
+        self.zhash ^= ZOBRIST_STM
+        return undo
+
+    def Unmake(self, undo: Undo) -> None:
+        self.wm, self.wk, self.bm, self.bk, self.zhash, self.score = undo
+
+    def ApplyMove(self, move: Move) -> Undo:
+        """Play a Move in place; the returned undo record restores the board through UndoMove."""
+        return self.Make(EncodeMove(move))
+
+    def UndoMove(self, undo: Undo) -> None:
+        self.Unmake(undo)
 
     def Pretty(self) -> str:
         lines = []
         header = "   " + " ".join(str(c) for c in range(self.size))
         lines.append(header)
         for r in range(self.size):
-            line = [str(r)]
-            for c in range(self.size):
-                line.append(self.board[r][c])
-            lines.append(f"{r}  " + " ".join(line[1:]))
+            lines.append(f"{r}  " + " ".join(self.PieceAt((r, c)) for c in range(self.size)))
         return "\n".join(lines)
+
+def _JumpTable(directions):
+    """Per-square (mid_bit, land_bit, land_sq) jumps for one piece kind."""
+    return tuple(tuple((SquareBit((r + dr, c + dc)), SquareBit((r + 2*dr, c + 2*dc)), (r + 2*dr) * 8 + c + 2*dc)
+                       for dr, dc in directions if 0 <= r + 2*dr < 8 and 0 <= c + 2*dc < 8)
+                 for r, c in _COORDS)
+
+WM_JUMP = _JumpTable(_DIRS['w'])
+BM_JUMP = _JumpTable(_DIRS['b'])
+K_JUMP = _JumpTable(_DIRS['W'])  # both colours' kings share the same steps
+
+def EncodeMove(move: Move) -> MoveCode:
+    code = SquareBit(move.StartingMoveLocation).bit_length() - 1
+    code |= (SquareBit(move.TargetingMoveLocation).bit_length() - 1) << 6
+    for cap in move.captured:
+        code |= SquareBit(cap) << 12
+    return code
+
+def _JumpPath(sq: int, dst: int, remaining: int):
+    """Squares visited by a jump sequence from sq to dst capturing exactly the pieces in remaining."""
+    if not remaining:
+        return [sq] if sq == dst else None
+    for mid, _, lsq in K_JUMP[sq]:
+        if mid & remaining:
+            rest = _JumpPath(lsq, dst, remaining ^ mid)
+            if rest is not None:
+                return [sq] + rest
+    return None
+
+def DecodeMove(code: MoveCode) -> Move:
+    """Expand a packed move code back into a Move (the UI and text interface work with these)."""
+    src, dst, captured = code & 63, (code >> 6) & 63, code >> 12
+    if not captured:
+        return Move(StartingMoveLocation=_COORDS[src],
+                    TargetingMoveLocation=_COORDS[dst],
+                    path=[_COORDS[src], _COORDS[dst]],
+                    is_capture=False,
+                    captured=[])
+    squares = _JumpPath(src, dst, captured)
+    return Move(StartingMoveLocation=_COORDS[src],
+                TargetingMoveLocation=_COORDS[dst],
+                path=[_COORDS[sq] for sq in squares],
+                is_capture=True,
+                captured=[_COORDS[(a + b) >> 1] for a, b in zip(squares, squares[1:])])
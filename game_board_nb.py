@@ -0,0 +1,186 @@
+from __future__ import annotations
+from array import array
+from typing import List
+
+from game_board import GameBoard, Move, DARK
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba/NumPy are optional; the kernels below then run as plain Python
+    np = None
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+# Numba-compiled move generation and evaluation over a flat uint8[64] board (index r*8+c).
+# Cells hold 0 = empty, 1 = white man, 2 = white king, 3 = black man, 4 = black king.
+# Kernels write into preallocated flat int64 buffers; Move objects are only built in LegalMoves.
+
+EMPTY, WM, WK, BM, BK = 0, 1, 2, 3, 4
+MAX_MOVES = 128
+MAX_JUMPS = 12
+MOVE_FIELDS = 3  # per move: source square, destination square, number of captured pieces
+
+# Diagonal steps: white men use 0..1, black men 2..3, kings 0..3.
+DIR_DR = (-1, -1, 1, 1)
+DIR_DC = (-1, 1, -1, 1)
+
+# Only the 32 dark squares can hold a piece, so the kernels never look at the others.
+DARK_SQ = tuple(r * 8 + c for r, c in DARK)
+
+_CELL_OF = {'.': EMPTY, 'w': WM, 'W': WK, 'b': BM, 'B': BK}
+
+@njit(cache=True)
+def _dir_range(piece):
+    if piece == WM:
+        return 0, 2
+    if piece == BM:
+        return 2, 4
+    return 0, 4
+
+@njit(cache=True)
+def _owned(piece, side_black):
+    if side_black:
+        return piece == BM or piece == BK
+    return piece == WM or piece == WK
+
+@njit(cache=True)
+def heuristic(cells):
+    # Same scoring as game_utilities.HeuristicScore: positive is good for black.
+    value = 0
+    for sq in DARK_SQ:
+        p = cells[sq]
+        if p == BM:
+            value += 3 + (sq >> 3)
+        elif p == BK:
+            value += 5
+        elif p == WM:
+            value -= 3 + (7 - (sq >> 3))
+        elif p == WK:
+            value -= 5
+    return value
+
+# No cache=True here or on its callers: Numba's on-disk cache cannot reload a recursive function (later
+# processes crash or fail to link), so these are compiled afresh in every process.
+@njit
+def _jumps(cells, side_black, src, sq, piece, depth, out_moves, out_captured, n, end):
+    """Extend the jump sequence standing on sq; returns the updated move count (slots stop at end)."""
+    found = False
+    r = sq >> 3
+    c = sq & 7
+    lo, hi = _dir_range(piece)
+    for d in range(lo, hi):
+        lr = r + 2 * DIR_DR[d]
+        lc = c + 2 * DIR_DC[d]
+        if lr < 0 or lr > 7 or lc < 0 or lc > 7:
+            continue
+        mid = (r + DIR_DR[d]) * 8 + (c + DIR_DC[d])
+        land = lr * 8 + lc
+        victim = cells[mid]
+        if cells[land] != EMPTY or victim == EMPTY or _owned(victim, side_black):
+            continue
+        # Play the jump on the board itself and restore it on the way back. A man that reaches its far row is
+        # only crowned once the move ends there; it has no forward jump left, so the sequence stops.
+        cells[sq] = EMPTY
+        cells[mid] = EMPTY
+        cells[land] = piece
+        out_captured[n * MAX_JUMPS + depth] = mid
+        found = True
+        n = _jumps(cells, side_black, src, land, piece, depth + 1, out_moves, out_captured, n, end)
+        cells[land] = EMPTY
+        cells[mid] = victim
+        cells[sq] = piece
+    if not found and depth > 0 and n < end:
+        out_moves[n * MOVE_FIELDS] = src
+        out_moves[n * MOVE_FIELDS + 1] = sq
+        out_moves[n * MOVE_FIELDS + 2] = depth
+        # The next sequence shares this one's prefix, so carry it into the next slot.
+        for k in range(depth):
+            out_captured[(n + 1) * MAX_JUMPS + k] = out_captured[n * MAX_JUMPS + k]
+        n += 1
+    return n
+
+@njit
+def all_legal_moves(cells, side_black, out_moves, out_captured, first=0):
+    """Fill move slots first.. of the buffers with every legal move for the side (captures are mandatory) and
+    return the slot after the last one. first lets a caller keep several move lists in one buffer."""
+    n = first
+    end = first + MAX_MOVES
+    for sq in DARK_SQ:
+        p = cells[sq]
+        if _owned(p, side_black):
+            n = _jumps(cells, side_black, sq, sq, p, 0, out_moves, out_captured, n, end)
+    if n > first:
+        return n
+    for sq in DARK_SQ:
+        p = cells[sq]
+        if not _owned(p, side_black):
+            continue
+        r = sq >> 3
+        c = sq & 7
+        lo, hi = _dir_range(p)
+        for d in range(lo, hi):
+            nr = r + DIR_DR[d]
+            nc = c + DIR_DC[d]
+            if 0 <= nr < 8 and 0 <= nc < 8 and cells[nr * 8 + nc] == EMPTY and n < end:
+                out_moves[n * MOVE_FIELDS] = sq
+                out_moves[n * MOVE_FIELDS + 1] = nr * 8 + nc
+                out_moves[n * MOVE_FIELDS + 2] = 0
+                n += 1
+    return n
+
+def ToCells(board: GameBoard):
+    """Flat uint8[64] copy of board (a bytearray when NumPy is missing)."""
+    cells = bytearray(64)
+    for r, c in DARK:
+        cells[r * 8 + c] = _CELL_OF[board.PieceAt((r, c))]
+    if np is not None:
+        return np.frombuffer(cells, dtype=np.uint8).copy()
+    return cells
+
+def _Buffers():
+    move_len = MAX_MOVES * MOVE_FIELDS
+    captured_len = (MAX_MOVES + 1) * MAX_JUMPS
+    if np is not None:
+        return np.zeros(move_len, dtype=np.int64), np.zeros(captured_len, dtype=np.int64)
+    return array('q', bytes(8 * move_len)), array('q', bytes(8 * captured_len))
+
+def LegalMoves(board: GameBoard, side: str) -> List[Move]:
+    """Same result as board.AllLegalMoves(side), generated by the compiled kernel."""
+    out_moves, out_captured = _Buffers()
+    n = all_legal_moves(ToCells(board), side == 'b', out_moves, out_captured)
+    moves = []
+    seen = set()
+    for i in range(n):
+        src, dst, count = (int(x) for x in out_moves[i * MOVE_FIELDS:(i + 1) * MOVE_FIELDS])
+        path = [(src >> 3, src & 7)]
+        captured = []
+        captured_bits = 0
+        at = src
+        for k in range(count):
+            mid = int(out_captured[i * MAX_JUMPS + k])
+            at = 2 * mid - at  # landing square sits one more step along the same diagonal
+            captured.append((mid >> 3, mid & 7))
+            captured_bits |= 1 << mid
+            path.append((at >> 3, at & 7))
+        # A king can loop round the same pieces either way; like GameBoard, keep one move per outcome.
+        key = (src, dst, captured_bits)
+        if key in seen:
+            continue
+        seen.add(key)
+        if count == 0:
+            path.append((dst >> 3, dst & 7))
+        moves.append(Move(StartingMoveLocation=path[0],
+                          TargetingMoveLocation=(dst >> 3, dst & 7),
+                          path=path,
+                          is_capture=count > 0,
+                          captured=captured))
+    return moves
+
+def HeuristicScoreNB(board: GameBoard) -> int:
+    return int(heuristic(ToCells(board)))
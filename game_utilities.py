@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Dict, Any, List
-from game_board import GameBoard
+from game_board import GameBoard, BV, WV, KING_VALUE
 
 @dataclass
 class MoveAnalytics:
@@ -10,6 +10,10 @@ class MoveAnalytics:
     AlphaBetaCuts: int = 0
     OrderingComparisons: int = 0
     OrderingGains: int = 0  # Count of times a better move was found earlier due to ordering
+    OrderingTTHits: int = 0  # Ordering keys taken from the transposition table instead of HeuristicScore
+    NullMoveCutoffs: int = 0  # Nodes cut off because passing the turn (and the verification search) still failed high
+    LMRReductions: int = 0  # Late moves first searched at reduced depth
+    PVSReSearches: int = 0  # Null-window searches that beat alpha and were repeated with the full window
     ElapsedMs: int = 0
 
 @dataclass
@@ -27,6 +31,10 @@ class CumulativeAnalytics:
             total.AlphaBetaCuts += m.AlphaBetaCuts
             total.OrderingComparisons += m.OrderingComparisons
             total.OrderingGains += m.OrderingGains
+            total.OrderingTTHits += m.OrderingTTHits
+            total.NullMoveCutoffs += m.NullMoveCutoffs
+            total.LMRReductions += m.LMRReductions
+            total.PVSReSearches += m.PVSReSearches
             total.ElapsedMs += m.ElapsedMs
         return {
             "TotalNodesExpanded": total.NodesExpanded,
@@ -34,6 +42,10 @@ class CumulativeAnalytics:
             "TotalAlphaBetaCuts": total.AlphaBetaCuts,
             "TotalOrderingComparisons": total.OrderingComparisons,
             "TotalOrderingGains": total.OrderingGains,
+            "TotalOrderingTTHits": total.OrderingTTHits,
+            "TotalNullMoveCutoffs": total.NullMoveCutoffs,
+            "TotalLMRReductions": total.LMRReductions,
+            "TotalPVSReSearches": total.PVSReSearches,
             "TotalElapsedMs": total.ElapsedMs
         }
 
@@ -42,21 +54,21 @@ def PrettyAnalytics(move_index: int, who: str, m: MoveAnalytics) -> str:
         f"[Move {move_index} - {who}] "
         f"NodesExpanded={m.NodesExpanded}, MaxFringeSize={m.MaxFringeSize}, "
         f"AlphaBetaCuts={m.AlphaBetaCuts}, OrderingComparisons={m.OrderingComparisons}, "
-        f"OrderingGains={m.OrderingGains}, ElapsedMs={m.ElapsedMs}"
+        f"OrderingGains={m.OrderingGains}, OrderingTTHits={m.OrderingTTHits}, "
+        f"NullMoveCutoffs={m.NullMoveCutoffs}, LMRReductions={m.LMRReductions}, "
+        f"PVSReSearches={m.PVSReSearches}, ElapsedMs={m.ElapsedMs}"
     )
 
+def _WeightedSum(bb: int, weights) -> int:
+    total = 0
+    while bb:
+        lsb = bb & -bb
+        bb ^= lsb
+        total += weights[lsb.bit_length() - 1]
+    return total
+
 def HeuristicScore(board: GameBoard) -> int:
-    # Positive is good for black (bot), negative for white (human).
-    value = 0
-    for r in range(board.size):
-        for c in range(board.size):
-            p = board.board[r][c]
-            if p == 'b':
-                value += 3 + r  # reward advancing
-            elif p == 'B':
-                value += 5
-            elif p == 'w':
-                value -= 3 + (board.size - 1 - r)
-            elif p == 'W':
-                value -= 5
-    return value
+    # Positive is good for black (bot), negative for white (human). Computed from scratch; board.score holds the
+    # same value, updated move by move.
+    return (_WeightedSum(board.bm, BV) - _WeightedSum(board.wm, WV) +
+            KING_VALUE * (board.bk.bit_count() - board.wk.bit_count()))
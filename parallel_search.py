@@ -0,0 +1,115 @@
+from __future__ import annotations
+from multiprocessing import Pool, shared_memory
+from typing import Dict, Optional, Tuple
+import time
+
+from game_board import GameBoard, Move, EncodeMove, DecodeMove
+from game_utilities import MoveAnalytics
+from search_tool_box import SearchToolBox
+
+NO_MOVE = 0xFFFF  # best-move field of an entry without a best move
+
+class SharedTT:
+    """
+    Fixed-size transposition table in shared memory that several processes read and write without locks.
+    Each slot is two uint64 words, (key ^ data, data), so a slot torn by a concurrent write reads back as a miss.
+    data packs value (int32) | best move key (16 bits) << 32 | depth << 48 | flag << 56.
+    Supports the dict operations SearchToolBox uses on its TT: get() and item assignment (always-replace).
+    """
+    def __init__(self, slots: int = 1 << 20, name: Optional[str] = None):
+        assert slots & (slots - 1) == 0, "slots must be a power of two"
+        self.Slots = slots
+        self._mask = slots - 1
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=slots * 16)
+        else:
+            # Pool workers share their parent's resource tracker, so attaching here does not take over cleanup.
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.Name = self._shm.name
+        self._words = self._shm.buf.cast('Q')
+
+    def get(self, key: int, default=None):
+        i = (key & self._mask) << 1
+        check, data = self._words[i], self._words[i + 1]
+        if data == 0 or check ^ data != key:
+            return default
+        value = data & 0xFFFFFFFF
+        if value & 0x80000000:
+            value -= 1 << 32
+        best = (data >> 32) & 0xFFFF
+        return ((data >> 48) & 0xFF, value, data >> 56, None if best == NO_MOVE else best)
+
+    def __setitem__(self, key: int, entry) -> None:
+        depth, value, flag, best = entry
+        data = ((value & 0xFFFFFFFF) | ((NO_MOVE if best is None else best) << 32) |
+                (min(depth, 0xFF) << 48) | (flag << 56))
+        i = (key & self._mask) << 1
+        self._words[i] = key ^ data
+        self._words[i + 1] = data
+
+    def Close(self) -> None:
+        self._words.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+_WorkerTT: Optional[SharedTT] = None
+_WorkerBots: Dict[str, SearchToolBox] = {}
+
+def _InitWorker(tt_name: str, slots: int) -> None:
+    global _WorkerTT
+    _WorkerTT = SharedTT(slots, name=tt_name)
+    # One bot per mode for the worker's lifetime, so history, killers and the move cache carry over from move to
+    # move. The helpers cooperate through the SharedTT, which the compiled kernel does not use, so it stays off.
+    for mode in ("minimax", "alpha-beta", "alpha-beta-ordering"):
+        bot = SearchToolBox(mode=mode, use_kernel=False)
+        bot.TT = _WorkerTT
+        _WorkerBots[mode] = bot
+
+def _SearchTask(board: GameBoard, side: str, mode: str, seconds_budget: int, ply_limit: int, rotation: int):
+    bot = _WorkerBots[mode]
+    bot.RootRotation = rotation
+    mv = bot.ChooseMove(board, side, SecondsBudget=seconds_budget, PlyLimit=ply_limit)
+    return (None if mv is None else EncodeMove(mv)), bot.CompletedDepth, bot.Analytics
+
+class LazySMP:
+    """
+    Lazy SMP: every worker process searches the same root at once, sharing one SharedTT, so entries written by one
+    worker cut off or reorder the others. Odd-numbered workers search one ply shallower and every worker starts
+    the root loop at a different move, which keeps them from walking the tree in lockstep.
+    """
+    def __init__(self, workers: int, tt_slots: int = 1 << 20):
+        self.Workers = workers
+        self.TT = SharedTT(tt_slots)
+        self._pool = Pool(workers, initializer=_InitWorker, initargs=(self.TT.Name, tt_slots))
+
+    def ChooseMove(self, board: GameBoard, side: str, mode: str, SecondsBudget: int = 2,
+                   PlyLimit: int = 7) -> Tuple[Optional[Move], MoveAnalytics]:
+        """Best move from the worker that completed the deepest iteration (ties go to the lowest worker), plus
+        analytics summed over all workers."""
+        begin = time.time()
+        jobs = [self._pool.apply_async(_SearchTask, (board, side, mode, SecondsBudget,
+                                                     max(1, PlyLimit - (i % 2)), i))
+                for i in range(self.Workers)]
+        results = [job.get() for job in jobs]
+        code = max(results, key=lambda r: r[1])[0]
+
+        total = MoveAnalytics()
+        for _, _, m in results:
+            total.NodesExpanded += m.NodesExpanded
+            total.MaxFringeSize = max(total.MaxFringeSize, m.MaxFringeSize)
+            total.AlphaBetaCuts += m.AlphaBetaCuts
+            total.OrderingComparisons += m.OrderingComparisons
+            total.OrderingGains += m.OrderingGains
+            total.OrderingTTHits += m.OrderingTTHits
+            total.NullMoveCutoffs += m.NullMoveCutoffs
+            total.LMRReductions += m.LMRReductions
+            total.PVSReSearches += m.PVSReSearches
+        total.ElapsedMs = int((time.time() - begin) * 1000)
+        return (None if code is None else DecodeMove(code)), total
+
+    def Close(self) -> None:
+        self._pool.terminate()
+        self._pool.join()
+        self.TT.Close()
@@ -1,17 +1,20 @@
 from __future__ import annotations
+import os
 import time
 from typing import Optional
 
 from game_board import GameBoard, Move
 from search_tool_box import SearchToolBox
 from game_utilities import CumulativeAnalytics, PrettyAnalytics, MoveAnalytics
+from parallel_search import LazySMP
 
 class PlayingTheGame:
     """
     Text UI loop for Human (White) vs Bot (Black).
     Complies with naming constraints for StartingMoveLocation and TargetingMoveLocation inputs.
     """
-    def __init__(self, mode: str = "alpha-beta-ordering", seconds_budget: int = 2, ply_limit: int = 7):
+    def __init__(self, mode: str = "alpha-beta-ordering", seconds_budget: int = 2, ply_limit: int = 7,
+                 workers: Optional[int] = None):
         """
         Initialize a Checkers game with a specific search strategy and limits.
 
@@ -19,6 +22,9 @@ class PlayingTheGame:
         "minimax"               — plain minimax (no pruning)
         "alpha-beta"            — minimax with alpha-beta pruning
         "alpha-beta-ordering"   — alpha-beta pruning with node ordering
+
+        workers: search processes for the bot (default: one per CPU core). With more than one, the alpha-beta
+        modes run a Lazy SMP search over a shared transposition table.
         """
         from game_board import GameBoard
         from search_tool_box import SearchToolBox
@@ -40,6 +46,9 @@ class PlayingTheGame:
         self.WhiteStats = CumulativeAnalytics()
         self.BlackStats = CumulativeAnalytics()
 
+        # Worker pool for parallel search, started once for the whole game
+        self.Workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.Parallel = LazySMP(self.Workers) if (self.Workers > 1 and self.UseAlphaBeta) else None
 
 
     def InputMove(self) -> Optional[Move]:
@@ -73,24 +82,36 @@ class PlayingTheGame:
             return True
 
     def BotTurn(self) -> bool:
-        mv = self.Bot.ChooseMove(self.Board, 'b', SecondsBudget=self.SecondsBudget, PlyLimit=self.PlyLimit)
+        if self.Parallel is not None:
+            mv, stats = self.Parallel.ChooseMove(self.Board, 'b', self.mode,
+                                                 SecondsBudget=self.SecondsBudget, PlyLimit=self.PlyLimit)
+        else:
+            mv = self.Bot.ChooseMove(self.Board, 'b', SecondsBudget=self.SecondsBudget, PlyLimit=self.PlyLimit)
+            stats = self.Bot.Analytics
         if mv is None:
             print("Bot has no legal moves.")
             return False
         self.Board.ApplyMove(mv)
-        self.BlackStats.Add(self.Bot.Analytics)
-        print(PrettyAnalytics(len(self.BlackStats.PerMove), "Bot(Black)", self.Bot.Analytics))
+        self.BlackStats.Add(stats)
+        print(PrettyAnalytics(len(self.BlackStats.PerMove), "Bot(Black)", stats))
         return True
 
     def Play(self) -> None:
+        try:
+            self._PlayLoop()
+        finally:
+            if self.Parallel is not None:
+                self.Parallel.Close()
+
+    def _PlayLoop(self) -> None:
         move_no = 1
         while True:
-            if self.Board.IsTerminal():
+            if self.Board.IsTerminal('w'):
                 break
             print(f"\n===== Move {move_no}: Human(White) =====")
             if not self.HumanTurn():
                 break
-            if self.Board.IsTerminal():
+            if self.Board.IsTerminal('b'):
                 break
             print(f"\n===== Move {move_no}: Bot(Black) =====")
             if not self.BotTurn():
@@ -1,8 +1,9 @@
 from __future__ import annotations
 import tkinter as tk
 from tkinter import messagebox
+import threading
 import time
-from game_board import GameBoard, Move
+from game_board import GameBoard, Move, DARK as DARK_SQUARES
 from search_tool_box import SearchToolBox
 from game_utilities import CumulativeAnalytics, PrettyAnalytics, MoveAnalytics
 
@@ -55,10 +56,16 @@ class TkCheckersApp:
 
         self.Selected = None  # (r,c) or None
         self.LegalTargets = []  # list of moves for selected piece
+        self.Thinking = False  # a background search is running; clicks are ignored until it lands
+        self._pending_move = None
+        self._search_failed = False  # the last search raised instead of returning a move
+        self._search_game = 0  # bumped by NewGame so a search from an abandoned game is dropped
+        self._human_turn_moves = {}  # src -> legal moves from that square for the human's turn, built once per turn
         self.Status = tk.StringVar()
         self.Status.set("Your turn: click a white piece, then a destination square.")
         self.canvas.bind("<Button-1>", self.OnClick)
 
+        self._StartHumanTurn()
         self.DrawBoard()
 
     def DrawBoard(self):
@@ -82,19 +89,18 @@ class TkCheckersApp:
                 self._HighlightSquare(tr, tc, HIGHLIGHT)
 
         # pieces
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                p = self.Board.board[r][c]
-                if p == '.':
-                    continue
-                x0 = PADDING + c * SQUARE + 8
-                y0 = PADDING + r * SQUARE + 8
-                x1 = x0 + SQUARE - 16
-                y1 = y0 + SQUARE - 16
-                fill = PIECE_WHITE if p.lower() == 'w' else PIECE_BLACK
-                self.canvas.create_oval(x0, y0, x1, y1, fill=fill, outline="black", width=2)
-                if p.isupper():
-                    self.canvas.create_oval(x0+10, y0+10, x1-10, y1-10, outline=KING_RING, width=4)
+        for r, c in DARK_SQUARES:
+            p = self.Board.PieceAt((r, c))
+            if p == '.':
+                continue
+            x0 = PADDING + c * SQUARE + 8
+            y0 = PADDING + r * SQUARE + 8
+            x1 = x0 + SQUARE - 16
+            y1 = y0 + SQUARE - 16
+            fill = PIECE_WHITE if p.lower() == 'w' else PIECE_BLACK
+            self.canvas.create_oval(x0, y0, x1, y1, fill=fill, outline="black", width=2)
+            if p.isupper():
+                self.canvas.create_oval(x0+10, y0+10, x1-10, y1-10, outline=KING_RING, width=4)
 
         self.canvas.create_text(WINDOW_W//2, WINDOW_H - 20, text=self.Status.get(), font=("Arial", 12))
 
@@ -105,20 +111,23 @@ class TkCheckersApp:
         y1 = y0 + SQUARE
         self.canvas.create_rectangle(x0, y0, x1, y1, outline=color, width=4)
 
+    def _StartHumanTurn(self):
+        self._human_turn_moves = {}
+        for mv in self.Board.AllLegalMoves('w'):
+            self._human_turn_moves.setdefault(mv.StartingMoveLocation, []).append(mv)
+
     def OnClick(self, event):
-        if self.Board.IsTerminal():
+        if self.Thinking or self.Board.IsTerminal('w'):
             return
 
         r, c = self._PixelToSquare(event.x, event.y)
         if r is None:
             return
 
-        current_legal = self.Board.AllLegalMoves('w')
-
         if self.Selected is None:
             if self.Board.PieceAt((r,c)) not in ('w','W'):
                 return
-            self.LegalTargets = [m for m in current_legal if m.StartingMoveLocation == (r,c)]
+            self.LegalTargets = self._human_turn_moves.get((r,c), [])
             if not self.LegalTargets:
                 return
             self.Selected = (r, c)
@@ -141,6 +150,7 @@ class TkCheckersApp:
 
         # Human move
         self.Board.ApplyMove(chosen)
+        self._human_turn_moves = {}
         man = MoveAnalytics(ElapsedMs=0)
         self.WhiteStats.Add(man)
         print(PrettyAnalytics(len(self.WhiteStats.PerMove), "Human(White)", man))
@@ -153,10 +163,45 @@ class TkCheckersApp:
         self.root.after(50, self.BotTurn)
 
     def BotTurn(self):
-        if self.Board.IsTerminal():
+        if self.Board.IsTerminal('b'):
             self.GameOver()
             return
-        mv = self.Bot.ChooseMove(self.Board, 'b', SecondsBudget=self.SecondsBudget, PlyLimit=self.PlyLimit)
+        # The search runs on a worker thread so Tk keeps redrawing; it works on a copy of the board because
+        # Make/Unmake would otherwise show up mid-search on the canvas.
+        self.Thinking = True
+        self._pending_move = None
+        self._search_started = time.time()
+        threading.Thread(target=self._search_thread, args=(self.Bot, self.Board.Clone(), self._search_game),
+                         daemon=True).start()
+        self._TickStatus()
+
+    def _search_thread(self, bot, board, game):
+        mv, failed = None, True
+        try:
+            mv = bot.ChooseMove(board, 'b', SecondsBudget=self.SecondsBudget, PlyLimit=self.PlyLimit)
+            failed = False
+        finally:
+            # Hand control back to Tk even when the search raised, or the board would stay locked.
+            if game == self._search_game:
+                self._pending_move = mv
+                self._search_failed = failed
+                self.root.after(0, self._apply_bot_move)
+
+    def _TickStatus(self):
+        if not self.Thinking:
+            return
+        self.Status.set(f"Bot is thinking... {time.time() - self._search_started:.1f}s")
+        self.DrawBoard()
+        self.root.after(200, self._TickStatus)
+
+    def _apply_bot_move(self):
+        self.Thinking = False
+        mv = self._pending_move
+        self._pending_move = None
+        if self._search_failed:
+            self.Status.set("Bot search failed (see console). Start a new game.")
+            self.DrawBoard()
+            return
         if mv is None:
             self.Status.set("Bot has no legal moves.")
             self.DrawBoard()
@@ -166,23 +211,31 @@ class TkCheckersApp:
         self.BlackStats.Add(self.Bot.Analytics)
         print(PrettyAnalytics(len(self.BlackStats.PerMove), "Bot(Black)", self.Bot.Analytics))
 
-        if self.Board.IsTerminal():
+        if self.Board.IsTerminal('w'):
             self.DrawBoard()
             self.GameOver()
             return
 
+        self._StartHumanTurn()
         self.Status.set("Your turn: click a white piece, then a destination square.")
         self.DrawBoard()
 
     def NewGame(self):
-        if not self.Board.IsTerminal():
+        if self.Thinking or not self.Board.IsTerminal('w'):
             if not messagebox.askyesno("Confirm", "A game is in progress. Start a new game?"):
                 return
+        self._search_game += 1
+        if self.Thinking:
+            # The abandoned search keeps running on the old bot until its deadline; give the new game its own,
+            # so the two never share a TT, killers, analytics or time-out flag.
+            self.Bot = SearchToolBox(mode=self.Bot.mode)
+        self.Thinking = False
         self.Board = GameBoard()
         self.WhiteStats = CumulativeAnalytics()
         self.BlackStats = CumulativeAnalytics()
         self.Selected = None
         self.LegalTargets = []
+        self._StartHumanTurn()
         self.Status.set("Your turn: click a white piece, then a destination square.")
         self.DrawBoard()
 
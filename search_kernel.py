@@ -0,0 +1,239 @@
+from __future__ import annotations
+from array import array
+from typing import Optional, Tuple
+import random
+
+from game_board import GameBoard, MoveCode
+from game_utilities import HeuristicScore
+from game_board_nb import (np, njit, NUMBA_AVAILABLE, EMPTY, WM, BM, MAX_MOVES, MAX_JUMPS, MOVE_FIELDS,
+                           DARK_SQ, ToCells, all_legal_moves, heuristic)
+
+# Alpha-beta search compiled with Numba over the game_board_nb cell board. Same values as SearchToolBox: scores
+# are HeuristicScore from black's side, the side to move with no moves (or either side with no pieces) is a leaf,
+# and at depth 0 a side that must capture keeps capturing (quiescence) before the position is scored.
+# Every ply keeps its move list in its own MAX_MOVES-slot region of one flat buffer, so the recursion allocates
+# nothing. Without Numba the kernel runs as plain Python and SearchToolBox keeps its own search instead.
+
+KERNEL_MAX_PLY = 32
+INF = 10**9
+EXACT, LOWER, UPPER = 0, 1, 2
+HISTORY_MAX = 1 << 20
+# counters slots
+NODES, CUTS, COMPARISONS, ABORTED, ROOT_BEST = 0, 1, 2, 3, 4
+COUNTERS = 5
+
+# Zobrist keys per (cell value, square), 63 bits so they fit int64; KERNEL_STM is toggled on every move.
+_krng = random.Random(0x5EED + 1)
+_zobrist = [_krng.getrandbits(63) for _ in range(5 * 64)]
+KERNEL_STM = _krng.getrandbits(63)
+if np is not None:
+    ZOB = np.array(_zobrist, dtype=np.int64)
+else:
+    ZOB = array('q', _zobrist)
+
+@njit(cache=True)
+def _make(cells, moves, captured, i, undo, ubase):
+    """Play move slot i on cells (captured pieces saved at undo[ubase:]); returns the hash change."""
+    src = moves[i * MOVE_FIELDS]
+    dst = moves[i * MOVE_FIELDS + 1]
+    count = moves[i * MOVE_FIELDS + 2]
+    piece = cells[src]
+    dz = ZOB[piece * 64 + src] ^ KERNEL_STM
+    for k in range(count):
+        mid = captured[i * MAX_JUMPS + k]
+        victim = cells[mid]
+        undo[ubase + k] = victim
+        dz ^= ZOB[victim * 64 + mid]
+        cells[mid] = EMPTY
+    crowned = (piece == WM and dst < 8) or (piece == BM and dst >= 56)  # like GameBoard.Make
+    landed = piece + 1 if crowned else piece
+    cells[src] = EMPTY
+    cells[dst] = landed
+    return dz ^ ZOB[landed * 64 + dst]
+
+@njit(cache=True)
+def _unmake(cells, moves, captured, i, undo, ubase, piece):
+    src = moves[i * MOVE_FIELDS]
+    dst = moves[i * MOVE_FIELDS + 1]
+    count = moves[i * MOVE_FIELDS + 2]
+    cells[dst] = EMPTY
+    cells[src] = piece
+    for k in range(count):
+        cells[captured[i * MAX_JUMPS + k]] = undo[ubase + k]
+
+@njit  # recursive, so not cached on disk (see game_board_nb._jumps)
+def _search(cells, side_black, depth, alpha, beta, ply, h, n_black, n_white, use_ordering,
+            moves, captured, scores, undo, tt_keys, tt_data, tt_mask, killers, history, counters, node_limit):
+    counters[NODES] += 1
+    if counters[NODES] > node_limit:
+        counters[ABORTED] = 1
+    if counters[ABORTED] != 0:
+        return heuristic(cells)
+    if n_black == 0 or n_white == 0 or ply >= KERNEL_MAX_PLY - 1:
+        return heuristic(cells)
+    a0 = alpha
+    b0 = beta
+    slot = h & tt_mask
+    tt_best = -1
+    if depth > 0 and tt_keys[slot] == h and tt_data[slot] != 0:
+        data = tt_data[slot]
+        value = (data & 0xFFFFFFFF) - (1 << 31)
+        tt_best = ((data >> 48) & 0xFFFF) - 1
+        # Never cut at the root: the caller reads the chosen move from this search's ROOT_BEST and move list.
+        if ply > 0 and (data >> 32) & 0xFF >= depth:
+            flag = (data >> 40) & 0xFF
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+    base = ply * MAX_MOVES
+    end = all_legal_moves(cells, side_black, moves, captured, base)
+    n = end - base
+    if n == 0 or (depth == 0 and moves[base * MOVE_FIELDS + 2] == 0):
+        return heuristic(cells)  # terminal, or quiet at depth 0 (moves are all captures or all not)
+    child_depth = depth - 1 if depth > 0 else 0
+    if use_ordering:
+        # TT move, then the two killers, then history; picked one at a time below.
+        for i in range(base, end):
+            key = moves[i * MOVE_FIELDS] | (moves[i * MOVE_FIELDS + 1] << 6)
+            if i - base == tt_best:
+                scores[i] = 1 << 42
+            elif key == killers[ply * 2]:
+                scores[i] = 1 << 41
+            elif key == killers[ply * 2 + 1]:
+                scores[i] = 1 << 40
+            else:
+                scores[i] = history[key]
+        counters[COMPARISONS] += n - 1
+
+    best = -INF if side_black else INF
+    best_i = base
+    ubase = ply * MAX_JUMPS
+    for k in range(n):
+        i = base + k
+        if use_ordering:
+            for j in range(base, end):
+                if scores[j] > scores[i]:
+                    i = j
+            scores[i] = -1
+        count = moves[i * MOVE_FIELDS + 2]
+        piece = cells[moves[i * MOVE_FIELDS]]
+        dz = _make(cells, moves, captured, i, undo, ubase)
+        if side_black:
+            val = _search(cells, False, child_depth, alpha, beta, ply + 1, h ^ dz, n_black, n_white - count,
+                          use_ordering, moves, captured, scores, undo, tt_keys, tt_data, tt_mask, killers, history,
+                          counters, node_limit)
+        else:
+            val = _search(cells, True, child_depth, alpha, beta, ply + 1, h ^ dz, n_black - count, n_white,
+                          use_ordering, moves, captured, scores, undo, tt_keys, tt_data, tt_mask, killers, history,
+                          counters, node_limit)
+        _unmake(cells, moves, captured, i, undo, ubase, piece)
+        improved = val > best if side_black else val < best
+        if improved:
+            best = val
+            best_i = i
+            if ply == 0:
+                counters[ROOT_BEST] = i - base
+        raised = False
+        if side_black and best > alpha:
+            alpha = best
+            raised = True
+        elif not side_black and best < beta:
+            beta = best
+            raised = True
+        if raised and use_ordering:
+            key = moves[i * MOVE_FIELDS] | (moves[i * MOVE_FIELDS + 1] << 6)
+            history[key] += depth * depth
+            if history[key] > HISTORY_MAX:
+                for j in range(4096):
+                    history[j] >>= 1
+        if alpha >= beta:
+            counters[CUTS] += 1
+            if use_ordering and depth > 0:
+                key = moves[i * MOVE_FIELDS] | (moves[i * MOVE_FIELDS + 1] << 6)
+                if killers[ply * 2] != key:
+                    killers[ply * 2 + 1] = killers[ply * 2]
+                    killers[ply * 2] = key
+            break
+
+    if counters[ABORTED] == 0 and depth > 0:
+        if best <= a0:
+            flag = UPPER
+        elif best >= b0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        failed_low = best <= a0 if side_black else best >= b0
+        stored_best = 0 if failed_low else best_i - base + 1
+        if not (tt_keys[slot] == h and (tt_data[slot] >> 32) & 0xFF > depth):
+            tt_keys[slot] = h
+            tt_data[slot] = ((best + (1 << 31)) | (min(depth, 0xFF) << 32) | (flag << 40) |
+                             (stored_best << 48))
+    return best
+
+def _Zeros(n: int):
+    if np is not None:
+        return np.zeros(n, dtype=np.int64)
+    return array('q', bytes(8 * n))
+
+class KernelSearch:
+    """
+    Python side of the compiled search: owns the buffers, TT, killers and history the kernel works in, and turns a
+    GameBoard into cells for it. The TT is direct-mapped (tt_slots must be a power of two) and lives across moves.
+    """
+    def __init__(self, tt_slots: int = 1 << 20):
+        assert tt_slots & (tt_slots - 1) == 0, "tt_slots must be a power of two"
+        slots = KERNEL_MAX_PLY * MAX_MOVES
+        self.moves = _Zeros(slots * MOVE_FIELDS)
+        self.captured = _Zeros((slots + 1) * MAX_JUMPS)
+        self.scores = _Zeros(slots)
+        self.undo = _Zeros(KERNEL_MAX_PLY * MAX_JUMPS)
+        self.tt_keys = _Zeros(tt_slots)
+        self.tt_data = _Zeros(tt_slots)
+        self.tt_mask = tt_slots - 1
+        self.killers = _Zeros(KERNEL_MAX_PLY * 2)
+        self.history = _Zeros(4096)
+        self.counters = _Zeros(COUNTERS)
+        if NUMBA_AVAILABLE:
+            # Compile the kernel here with a tiny search, so the first real search's time budget is not spent on
+            # it, then forget what that search stored.
+            self.Search(GameBoard(), 'b', 2)
+            for table in (self.tt_keys, self.tt_data, self.history):
+                table[:] = 0
+            self.ClearKillers()
+
+    def ClearKillers(self) -> None:
+        for i in range(KERNEL_MAX_PLY * 2):
+            self.killers[i] = 0
+
+    def Search(self, board: GameBoard, side: str, depth: int, use_ordering: bool = True,
+               node_limit: int = 1 << 62) -> Tuple[Optional[MoveCode], int]:
+        """One fixed-depth search from board; returns (best move, score). self.counters holds nodes, cuts,
+        ordering comparisons and whether node_limit stopped the search early (then the result is partial)."""
+        legal = board.LegalMoveCodes(side)
+        if not legal or board.IsTerminal(side):
+            return (legal[0] if legal else None), HeuristicScore(board)
+        cells = ToCells(board)
+        side_black = side == 'b'
+        h = 0
+        for sq in DARK_SQ:
+            if cells[sq] != EMPTY:
+                h ^= _zobrist[int(cells[sq]) * 64 + sq]  # int(): cells is uint8 and would wrap at 256
+        if side_black:
+            h ^= KERNEL_STM
+        for i in range(COUNTERS):
+            self.counters[i] = 0
+        score = _search(cells, side_black, depth, -INF, INF, 0, h, board.bm.bit_count() + board.bk.bit_count(),
+                        board.wm.bit_count() + board.wk.bit_count(), use_ordering, self.moves, self.captured,
+                        self.scores, self.undo, self.tt_keys, self.tt_data, self.tt_mask, self.killers, self.history,
+                        self.counters, node_limit)
+        i = int(self.counters[ROOT_BEST])
+        code = int(self.moves[i * MOVE_FIELDS]) | (int(self.moves[i * MOVE_FIELDS + 1]) << 6)
+        for k in range(int(self.moves[i * MOVE_FIELDS + 2])):
+            code |= 1 << (12 + int(self.captured[i * MAX_JUMPS + k]))
+        return code, int(score)
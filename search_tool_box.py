@@ -2,26 +2,58 @@ from __future__ import annotations
 from typing import Optional, List, Tuple
 import time
 
-from game_board import GameBoard, Move
-from game_utilities import MoveAnalytics, HeuristicScore
+from game_board import GameBoard, Move, MoveCode, DecodeMove, MOVE_KEY_MASK
+from game_utilities import MoveAnalytics
+from search_kernel import KernelSearch, NUMBA_AVAILABLE, NODES, CUTS, COMPARISONS, ABORTED
+
+# Transposition-table entry flags: the stored value is exact, a lower bound (fail-high) or an upper bound (fail-low).
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 1 << 20
+MAX_PLY = 64  # rows in the killer table
+HISTORY_MAX = 1 << 20  # history scores are halved once one passes this
+MOVE_CACHE_MAX = 1 << 18
+NULL_MOVE_R = 2  # depth reduction for the null-move search
+# Aspiration half-widths tried around the previous iteration's score before falling back to a full window.
+# HeuristicScore counts a man as 3-10, so these are about one and four men.
+ASPIRATION_WINDOWS = (3, 12)
+LMR_MIN_INDEX = 3  # moves before this index in the ordered list are always searched at full depth
+TIME_CHECK_MASK = 4095  # the clock is read once every TIME_CHECK_MASK + 1 nodes
 
 class SearchToolBox:
     """
     Provides Minimax with Alpha-Beta Pruning, with optional move ordering and
-    time/ply limits.
+    time/ply limits. The alpha-beta modes share a Zobrist-keyed transposition table
+    (TT) across moves: zhash -> (depth, value, flag, best_move), where value and flag are from
+    the side to move's point of view (negamax) and best_move is the move's MOVE_KEY_MASK bits
+    (source and destination squares).
+    Internally moves are packed MoveCode ints; ChooseMove decodes its answer into a Move.
     """
-    def __init__(self, mode: str = "alpha-beta-ordering"):
+    def __init__(self, mode: str = "alpha-beta-ordering", use_kernel: bool = False):
         """
         mode:
         "minimax"               — plain minimax (no pruning)
         "alpha-beta"            — minimax with alpha-beta pruning
         "alpha-beta-ordering"   — alpha-beta pruning with move ordering
+        use_kernel: in the alpha-beta modes, search with the Numba-compiled kernel in search_kernel.py when Numba is
+        installed. It is faster but keeps to the TT, killers, history and quiescence: no null move, aspiration
+        windows, LMR or PVS, so their analytics stay 0. Building it compiles the kernel, which takes a few seconds.
         """
         self.mode = mode
         self.UseOrdering = (mode == "alpha-beta-ordering")
         self.UseAlphaBeta = (mode in ("alpha-beta", "alpha-beta-ordering"))
         self.Analytics = MoveAnalytics()
-
+        self.TT = {}  # a dict, or a parallel_search.SharedTT when running as a Lazy SMP worker
+        self.RootRotation = 0  # Lazy SMP helpers start the root move loop at a different move
+        self.CompletedDepth = 0  # deepest iteration the last ChooseMove finished
+        # Two moves per ply that recently caused a beta cutoff there; ordering tries them first without evaluating them.
+        self.killers: List[List[Optional[MoveCode]]] = [[None, None] for _ in range(MAX_PLY)]
+        # History heuristic: how often each (source, destination) pair (a move's MOVE_KEY_MASK bits) raised a bound,
+        # weighted by depth*depth. Below the root, moves are ordered by it instead of by evaluating every child.
+        self.history: List[int] = [0] * (MOVE_KEY_MASK + 1)
+        self.move_cache = {}  # position key -> LegalMoveCodes, so transposed visits skip move generation
+        self._time_check_counter = 0
+        self._timed_out = False  # set once the deadline has passed; every node then returns at once
+        self.Kernel = KernelSearch() if use_kernel and NUMBA_AVAILABLE and self.UseAlphaBeta else None
 
     def ChooseMove(self, board: GameBoard, side: str, SecondsBudget: int = 2, PlyLimit: int = 7) -> Move:  # We interactively ask the user for T and P. The defaults are for fallback safety.
         """Iterative deepening up to PlyLimit or SecondsBudget seconds.
@@ -29,111 +61,326 @@ class SearchToolBox:
         Returns the best Move for 'side'.
         """
         self.Analytics = MoveAnalytics()
+        self.CompletedDepth = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY)]  # kept across iterations: the root stays the same
+        self._time_check_counter = 0
+        self._timed_out = False
         deadline = time.time() + max(1, SecondsBudget)
 
-        best_move: Optional[Move] = None
+        best_move: Optional[MoveCode] = None
         best_score = None
-        # iterative deepening
+        if self.Kernel is not None:
+            best_move = self._KernelIterations(board, side, deadline, PlyLimit)
+        else:
+            # iterative deepening
+            for depth in range(1, max(1, PlyLimit) + 1):
+                move, score = self._AspirationSearch(board, side, depth, deadline, best_move, best_score)
+                if self._timed_out:
+                    break
+                if move is not None:
+                    best_move, best_score = move, score
+                    self.CompletedDepth = depth
+                if time.time() > deadline:
+                    break
+        if best_move is None:
+            moves = board.LegalMoveCodes(side)
+            return DecodeMove(moves[0]) if moves else None
+        return DecodeMove(best_move)
+
+    def _AspirationSearch(self, board: GameBoard, side: str, depth: int, deadline: float,
+                          pv_move: Optional[MoveCode], prev_score: Optional[int]) -> Tuple[Optional[MoveCode], Optional[int]]:
+        """Search depth with a narrow window around the previous iteration's score, widening it on a fail-low or
+        fail-high until the score lands inside (the last try is the full window)."""
+        if not self.UseOrdering or prev_score is None:
+            return self._SearchDepth(board, side, depth, deadline, pv_move)
+        for window in ASPIRATION_WINDOWS:
+            alpha, beta = prev_score - window, prev_score + window
+            move, score = self._SearchDepth(board, side, depth, deadline, pv_move, alpha, beta)
+            if self._timed_out or score is None or alpha < score < beta:
+                return move, score
+            pv_move = move
+        return self._SearchDepth(board, side, depth, deadline, pv_move)
+
+    def _KernelIterations(self, board: GameBoard, side: str, deadline: float, PlyLimit: int) -> Optional[MoveCode]:
+        """Iterative deepening through the compiled kernel. Numba code cannot read the clock, so each iteration
+        gets a node budget from the node rate measured so far instead."""
+        kernel = self.Kernel
+        kernel.ClearKillers()
+        start = time.time()
+        best_move = None
+        nodes = 0
         for depth in range(1, max(1, PlyLimit) + 1):
-            move, score = self._SearchDepth(board, side, depth, deadline)
-            if time.time() > deadline:
+            elapsed = time.time() - start
+            limit = 1 << 62 if nodes == 0 or elapsed <= 0 else max(1, int(nodes / elapsed * (deadline - time.time())))
+            move, _ = kernel.Search(board, side, depth, self.UseOrdering, limit)
+            counters = kernel.counters
+            nodes += int(counters[NODES])
+            self.Analytics.NodesExpanded += int(counters[NODES])
+            self.Analytics.AlphaBetaCuts += int(counters[CUTS])
+            self.Analytics.OrderingComparisons += int(counters[COMPARISONS])
+            if counters[ABORTED]:
                 break
             if move is not None:
-                best_move, best_score = move, score
-        if best_move is None:
-            moves = board.AllLegalMoves(side)
-            return moves[0] if moves else None
+                best_move = move
+                self.CompletedDepth = depth
+            if time.time() > deadline:
+                break
+        self.Analytics.ElapsedMs += int((time.time() - start) * 1000)
         return best_move
 
-    def _OrderMoves(self, board: GameBoard, side: str, moves: List[Move]) -> List[Move]:
+    def _OrderMoves(self, board: GameBoard, side: str, moves: List[MoveCode], ply: int,
+                    pv_move: Optional[MoveCode] = None) -> List[MoveCode]:
+        """pv_move: best move already known for this position (TT entry, or the previous iteration at the root);
+        it goes first, then the killers, then the rest by history (or evaluation at the root)."""
         if not self.UseOrdering:
             return moves
-        scored = []
+        first = []
+        if pv_move is not None:
+            pv_move &= MOVE_KEY_MASK
+            first = [m for m in moves if m & MOVE_KEY_MASK == pv_move][:1]
+        first += [k for k in self.killers[ply] if k is not None and k in moves and k not in first]
+        if first:
+            moves = [m for m in moves if m not in first]
+        if ply > 0:
+            history = self.history
+            rest = sorted(moves, key=lambda m: history[m & MOVE_KEY_MASK], reverse=True)
+            self.Analytics.OrderingComparisons += max(0, len(rest) - 1)
+            return first + rest
+        # At the root the cost is paid once per iteration, so the children are evaluated properly.
+        # A child the TT already knows about is keyed by its searched value (exact, or an upper bound for the
+        # child, which is a lower bound for the mover) instead of its static evaluation.
+        color = 1 if side == 'b' else -1
+        scores = []
         for m in moves:
-            clone = board.Clone()
-            clone.ApplyMove(m)
-            score = HeuristicScore(clone)
-            if side == 'w':
-                score = -score
-            scored.append((score, m))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        self.Analytics.OrderingComparisons += max(0, len(scored) - 1)
-        return [m for _, m in scored]
-
-    def _SearchDepth(self, board: GameBoard, side: str, depth: int, deadline: float) -> Tuple[Optional[Move], Optional[int]]:
+            undo = board.Make(m)
+            entry = self.TT.get(board.zhash)
+            if entry is not None and entry[2] != LOWER:
+                scores.append(-entry[1])
+                self.Analytics.OrderingTTHits += 1
+            else:
+                scores.append(board.score * color)
+            board.Unmake(undo)
+        # Sort the indices with the C-level scores.__getitem__ as key: no (score, move) tuples, no lambda calls.
+        order = sorted(range(len(moves)), key=scores.__getitem__, reverse=True)
+        self.Analytics.OrderingComparisons += max(0, len(order) - 1)
+        return first + [moves[i] for i in order]
+
+    def _Moves(self, bd: GameBoard, side: str) -> List[MoveCode]:
+        """LegalMoveCodes memoised per position and side alongside the TT (oldest entry evicted once
+        MOVE_CACHE_MAX is reached). The lists are shared, so callers must not modify them."""
+        key = bd.zhash if side == 'w' else ~bd.zhash
+        cache = self.move_cache
+        moves = cache.get(key)
+        if moves is None:
+            moves = bd.LegalMoveCodes(side)
+            if len(cache) >= MOVE_CACHE_MAX:
+                del cache[next(iter(cache))]
+            cache[key] = moves
+        return moves
+
+    def _AddHistory(self, m: MoveCode, d: int) -> None:
+        history = self.history
+        key = m & MOVE_KEY_MASK
+        history[key] += d * d
+        if history[key] > HISTORY_MAX:
+            self.history = [v >> 1 for v in history]  # age every entry so recent cutoffs keep their weight
+
+    def _AddKiller(self, ply: int, m: MoveCode) -> None:
+        km = self.killers[ply]
+        if m != km[0]:
+            km[1] = km[0]
+            km[0] = m
+
+    def _StoreTT(self, key: int, depth: int, value: int, a0: int, be0: int, best_move: Optional[MoveCode]) -> None:
+        """Record a searched node; a0/be0 are the window the node was entered with."""
+        if value <= a0:
+            flag = UPPER
+        elif value >= be0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if best_move is not None:
+            best_move &= MOVE_KEY_MASK
+        tt = self.TT
+        old = tt.get(key)
+        if old is not None and old[0] > depth:
+            return  # depth-preferred: keep the result of the deeper search
+        if type(tt) is dict and old is None and len(tt) >= TT_MAX_ENTRIES:
+            self._EvictTT(depth)
+        tt[key] = (depth, value, flag, best_move)
+
+    def _EvictTT(self, depth: int) -> None:
+        """Make room in a full dict TT by dropping every entry searched no deeper than depth; if all entries
+        are deeper, drop the oldest one instead. (A SharedTT has fixed slots and never needs this.)"""
+        tt = self.TT
+        shallow = [k for k, entry in tt.items() if entry[0] <= depth]
+        for k in shallow:
+            del tt[k]
+        if not shallow:
+            del tt[next(iter(tt))]
+
+    def _SearchDepth(self, board: GameBoard, side: str, depth: int, deadline: float,
+                     pv_move: Optional[MoveCode] = None, alpha: int = -10**9,
+                     beta: int = 10**9) -> Tuple[Optional[MoveCode], Optional[int]]:
+        """One root search; with a window narrower than (alpha, beta) a score on or outside it is only a bound.
+        alpha, beta and the returned score are from black's side, like HeuristicScore."""
         start = time.time()
-        maximizing = (side == 'b')
         best_move = None
-        alpha, beta = -10**9, 10**9
+        # Nodes and cutoffs are counted in these one-slot lists and added to self.Analytics once at the end: a list
+        # item update is cheaper than an attribute update on every node.
+        nodes = [0]
+        cuts = [0]
 
-        def max_value(bd: GameBoard, d: int, a: int, be: int) -> int:
-            if time.time() > deadline:
-                return HeuristicScore(bd)
-            self.Analytics.NodesExpanded += 1
-            if d == 0 or bd.IsTerminal():
-                return HeuristicScore(bd)
-            moves = bd.AllLegalMoves('b')
-            if not moves:
-                return HeuristicScore(bd)
-            ordered = self._OrderMoves(bd, 'b', moves)
+        def quiesce(bd: GameBoard, a: int, be: int, color: int) -> int:
+            # Value of a depth-0 node for the side to move (color as in negamax). A position where that side can
+            # capture is not quiet, so instead of evaluating it the forced captures are searched, biggest first,
+            # until one side has none. Captures are mandatory, so there is no stand-pat option.
+            side = 'b' if color > 0 else 'w'
+            captures = bd.LegalCaptureCodes(side) if (bd.wm | bd.wk) and (bd.bm | bd.bk) else None
+            if not captures:
+                return bd.score * color
+            if len(captures) > 1:
+                captures = sorted(captures, key=lambda m: (m >> 12).bit_count(), reverse=True)
             best = -10**9
-            for m in ordered:
-                clone = bd.Clone()
-                clone.ApplyMove(m)
-                val = min_value(clone, d-1, a, be)
-                best = max(best, val)
-                a = max(a, best)
+            for m in captures:
+                undo = bd.Make(m)
+                nodes[0] += 1
+                val = -quiesce(bd, -be, -a, -color)
+                bd.Unmake(undo)
+                if val > best:
+                    best = val
+                if best > a:
+                    a = best
                 if self.UseAlphaBeta and a >= be:
-                    self.Analytics.AlphaBetaCuts += 1
+                    cuts[0] += 1
                     break
             return best
 
-        def min_value(bd: GameBoard, d: int, a: int, be: int) -> int:
-            if time.time() > deadline:
-                return HeuristicScore(bd)
-            self.Analytics.NodesExpanded += 1
-            if d == 0 or bd.IsTerminal():
-                return HeuristicScore(bd)
-            moves = bd.AllLegalMoves('w')
-            if not moves:
-                return HeuristicScore(bd)
-            ordered = self._OrderMoves(bd, 'w', moves)
-            best = 10**9
-            for m in ordered:
-                clone = bd.Clone()
-                clone.ApplyMove(m)
-                val = max_value(clone, d-1, a, be)
-                best = min(best, val)
-                be = min(be, best)
+        def negamax(bd: GameBoard, d: int, a: int, be: int, ply: int, color: int, allow_null: bool = True) -> int:
+            # Value for the side to move: color is +1 when that is black, -1 when it is white. TT entries hold
+            # these side-to-move values too.
+            self._time_check_counter += 1
+            if self._time_check_counter & TIME_CHECK_MASK == 0 and time.time() > deadline:
+                self._timed_out = True
+            if self._timed_out:
+                return bd.score * color
+            nodes[0] += 1
+            if d == 0:
+                return quiesce(bd, a, be, color)
+            side = 'b' if color > 0 else 'w'
+            moves = self._Moves(bd, side) if (bd.wm | bd.wk) and (bd.bm | bd.bk) else None
+            if not moves:  # terminal: a side without pieces, or the side to move stuck
+                return bd.score * color
+            a0, be0 = a, be
+            tt_move = None
+            if self.UseAlphaBeta:
+                entry = self.TT.get(bd.zhash)
+                if entry is not None:
+                    tt_move = entry[3]
+                if entry is not None and entry[0] >= d:
+                    _, val, flag, _ = entry
+                    if flag == EXACT:
+                        return val
+                    if flag == LOWER:
+                        a = max(a, val)
+                    else:
+                        be = min(be, val)
+                    if a >= be:
+                        return val
+            # Null move: if the side to move could pass and still fail high at reduced depth, and a reduced search
+            # of the real moves agrees (checkers has zugzwang), cut. Only on null windows, never twice in a row,
+            # never when a capture is forced.
+            if self.UseOrdering and allow_null and d >= 3 and be - a == 1 and not bd._HasAnyCapture(side):
+                undo = bd.MakeNull()
+                val = -negamax(bd, d - 1 - NULL_MOVE_R, -be, -be + 1, ply + 1, -color, False)
+                bd.Unmake(undo)
+                if val >= be and negamax(bd, d - 1 - NULL_MOVE_R, be - 1, be, ply, color, False) >= be:
+                    self.Analytics.NullMoveCutoffs += 1
+                    return be
+            ordered = self._OrderMoves(bd, side, moves, ply, tt_move)
+            best = -10**9
+            best_m = None
+            # Principal-variation search: ordering expects the first move to be best, so the others only get a
+            # null window at alpha and a full-window re-search if they beat it after all. Late moves (quiet ones,
+            # well down the ordered list) start with that null window at reduced depth.
+            lmr = self.UseOrdering and d >= 3 and not ordered[0] >> 12
+            other = 'w' if color > 0 else 'b'
+            for idx, m in enumerate(ordered):
+                undo = bd.Make(m)
+                if d == 1:
+                    # The child is a leaf: count and evaluate it here instead of entering another frame for it.
+                    self._time_check_counter += 1
+                    if self._time_check_counter & TIME_CHECK_MASK == 0 and time.time() > deadline:
+                        self._timed_out = True
+                    if not self._timed_out:
+                        nodes[0] += 1
+                    if bd._HasAnyCapture(other):
+                        val = -quiesce(bd, -be, -a, -color)
+                    else:
+                        val = bd.score * color
+                elif idx == 0 or not self.UseOrdering:
+                    val = -negamax(bd, d - 1, -be, -a, ply + 1, -color)
+                else:
+                    val = a + 1
+                    if lmr and idx >= LMR_MIN_INDEX:
+                        self.Analytics.LMRReductions += 1
+                        val = -negamax(bd, d - 2 - (idx >= 6), -a - 1, -a, ply + 1, -color)
+                    if val > a:
+                        val = -negamax(bd, d - 1, -a - 1, -a, ply + 1, -color)
+                        if a < val < be:
+                            self.Analytics.PVSReSearches += 1
+                            val = -negamax(bd, d - 1, -be, -a, ply + 1, -color)
+                bd.Unmake(undo)
+                if val > best:
+                    best, best_m = val, m
+                if best > a:
+                    a = best
+                    if self.UseOrdering:
+                        self._AddHistory(m, d)
                 if self.UseAlphaBeta and a >= be:
-                    self.Analytics.AlphaBetaCuts += 1
+                    cuts[0] += 1
+                    if self.UseOrdering:
+                        self._AddKiller(ply, m)
                     break
+            if self.UseAlphaBeta and not self._timed_out:  # values from an interrupted search are not trustworthy
+                self._StoreTT(bd.zhash, d, best, a0, be0, best_m if best > a0 else None)  # after a fail-low no move is known to be best
             return best
 
-        moves = board.AllLegalMoves(side)
+        moves = board.LegalMoveCodes(side)
         if not moves:
             return None, None
-        moves = self._OrderMoves(board, side, moves)
-        best_score = -10**9 if maximizing else 10**9
+        moves = self._OrderMoves(board, side, moves, 0, pv_move)
+        if self.RootRotation:
+            k = self.RootRotation % len(moves)
+            moves = moves[k:] + moves[:k]
+        color = 1 if side == 'b' else -1
+        a, be = (alpha, beta) if color > 0 else (-beta, -alpha)
+        best_score = -10**9
         for idx, m in enumerate(moves):
-            clone = board.Clone()
-            clone.ApplyMove(m)
-            if maximizing:
-                score = min_value(clone, depth-1, alpha, beta)
-                if score > best_score:
-                    if idx > 0:
-                        self.Analytics.OrderingGains += 1
-                    best_score, best_move = score, m
-                alpha = max(alpha, best_score)
+            undo = board.Make(m)
+            if idx == 0 or not self.UseOrdering:
+                score = -negamax(board, depth - 1, -be, -a, 1, -color)
             else:
-                score = max_value(clone, depth-1, alpha, beta)
-                if score < best_score:
-                    if idx > 0:
-                        self.Analytics.OrderingGains += 1
-                    best_score, best_move = score, m
-                beta = min(beta, best_score)
-            if time.time() > deadline:
+                score = -negamax(board, depth - 1, -a - 1, -a, 1, -color)
+                if a < score < be:
+                    self.Analytics.PVSReSearches += 1
+                    score = -negamax(board, depth - 1, -be, -a, 1, -color)
+            board.Unmake(undo)
+            if score > best_score:
+                if idx > 0:
+                    self.Analytics.OrderingGains += 1
+                best_score, best_move = score, m
+            if best_score > a:
+                a = best_score
+                if self.UseOrdering:
+                    self._AddHistory(m, depth)
+            if self._timed_out:
+                break
+            if self.UseAlphaBeta and a >= be:
+                cuts[0] += 1
                 break
 
+        self.Analytics.NodesExpanded += nodes[0]
+        self.Analytics.AlphaBetaCuts += cuts[0]
         self.Analytics.ElapsedMs += int((time.time() - start) * 1000)
-        return best_move, best_score
+        return best_move, best_score * color